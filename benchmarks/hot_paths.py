@@ -0,0 +1,261 @@
+# Times the busiest pages and scripts of the app on a generated database (see seed.py) and compares them with a saved baseline
+# Each case runs --repeat times: its time is the median of the runs and its query count the count of the last run, once caches are warm
+# Query counts don't depend on the machine, so any increase fails the comparison; times depend on the machine the baseline
+# was recorded on, so they only fail the comparison with --check-times, when they are more than --tolerance slower
+#
+# Usage: python benchmarks/hot_paths.py [--users 20] [--tasks 1000] [--repeat 5] [--baseline benchmarks/baseline.json] [--save] [--check-times]
+# To compare times, first record a baseline on the same machine, e.g. --save --baseline /tmp/local.json, then
+# --check-times --baseline /tmp/local.json after the change
+# The database is a temporary SQLite file, the app's database is not used
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+# The app reads its settings when it is imported, so the temporary database and a secret key are set first
+directory = tempfile.mkdtemp()
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+os.environ['OUTBOX_WORKER'] = 'false'
+os.environ['REMINDER_SCHEDULER'] = 'false'
+
+# Makes app.py and seed.py importable when running from the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event, select, func
+from sqlalchemy.engine import Engine
+from app import app, db, mail, fragment_cache, Task, ScheduledReminder, SentReminder, SORT_MODES, SEARCH_SORT, rebuild_scheduled_reminders, utc_now
+from reminders import send_reminders
+from seed import seed_database, PASSWORD
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Filters of the filter popup the tasks page is timed with, combined with every sort
+today = date.today()
+TASK_FILTERS = {
+    'no filter': {},
+    'priority and status': {'priority': ['High', 'Medium'], 'status': ['In-Progress']},
+    'month and year': {'month': [str(today.month)], 'year-filter': str(today.year)},
+    'day': {'month': [str(today.month)], 'year-filter': str(today.year), 'day-filter': str(today.day)},
+}
+
+# Number of SQL statements run since the counter was reset, counts every connection of the process
+query_count = 0
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def count_query(connection, cursor, statement, parameters, context, executemany):
+    global query_count
+    query_count += 1
+
+# One timed piece of work
+@dataclass
+class Case:
+    name: str
+    run: object             # function doing the timed work
+    setup: object = None    # function called before each run, not timed
+
+# Helper function: runs a case repeat times, returns its query count and median time in seconds
+def measure(case, repeat):
+    global query_count
+    times = []
+    for number in range(repeat):
+        if case.setup:
+            case.setup(number)
+        query_count = 0
+        start = time.perf_counter()
+        case.run(number)
+        times.append(time.perf_counter() - start)
+    return {'queries': query_count, 'seconds': round(statistics.median(times), 6)}
+
+# Helper function: returns a test client logged in as the given user
+def logged_in_client(user_id):
+    client = app.test_client()
+    client.post('/login', data={'email': f'bench{user_id}@example.com', 'password': PASSWORD})
+    return client
+
+# Helper function: raises an error if a page didn't load, so a broken page isn't timed as a fast one
+def check(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.path} returned {response.status_code}")
+    return response
+
+# Helper function: puts every reminder back as not sent, so each run of a reminder case sends the same emails
+def reset_reminders():
+    with app.app_context():
+        db.session.execute(SentReminder.__table__.delete())
+        db.session.execute(Task.__table__.update().values(set_today_reminder=True, set_tomorrow_reminder=True))
+        rebuild_scheduled_reminders()
+        db.session.commit()
+
+# Helper function: returns the end of the upcoming hour in which the most reminders of a kind are sent, as the 'now' of a reminder run
+def busiest_send_time(kind):
+    with app.app_context():
+        hour = func.strftime('%Y-%m-%d %H:00:00', ScheduledReminder.send_at)
+        row = db.session.execute(
+            select(hour, func.count()).where(ScheduledReminder.kind == kind, ScheduledReminder.send_at > utc_now())
+            .group_by(hour).order_by(func.count().desc(), hour).limit(1)
+        ).first()
+    return datetime.fromisoformat(row[0]) + timedelta(minutes=59) if row else utc_now()
+
+# Helper function: builds the cases, user_ids are the generated users; the first one is used for the pages,
+# the last ones have their data cleared by the delete_data case
+def build_cases(user_ids, repeat):
+    client = logged_in_client(user_ids[0])
+    cases = []
+
+    # Home page for the current month, six months ago and three months ahead; the query count of a case is taken once
+    # the cache is warm, so each month is also loaded with an empty fragment cache to count the calendar and stats queries
+    months = {'current month': today, 'past month': today - timedelta(days=182), 'future month': today + timedelta(days=91)}
+    for label, day in months.items():
+        url = f'/home?month={day.month}&year={day.year}'
+        cases.append(Case(f'home {label}', lambda number, url=url: check(client.get(url))))
+        cases.append(Case(f'home {label} cold cache', lambda number, url=url: check(client.get(url)), lambda number: fragment_cache.clear()))
+
+    # Days of the next month, loaded by script.js when the calendar moves to it
+    month_start = date(today.year, today.month, 1)
+    next_month_start = (month_start + timedelta(days=31)).replace(day=1)
+    month_end = (next_month_start + timedelta(days=31)).replace(day=1)
+    url = f'/api/calendar?start={next_month_start.isoformat()}&end={month_end.isoformat()}'
+    cases.append(Case('calendar api next month', lambda number, url=url: check(client.get(url))))
+
+    # Tasks page under every sort and filter, the sort and filters are saved within the session before the timed request
+    def apply_filters(sort, filters):
+        def setup(number):
+            client.post('/search_tasks', data={'search': ''})
+            client.post('/filter_sort_task', data={'action': 'apply', 'sort': sort, **filters})
+        return setup
+    for sort in SORT_MODES:
+        if sort == SEARCH_SORT:
+            continue
+        for label, filters in TASK_FILTERS.items():
+            cases.append(Case(f'tasks {sort} {label}', lambda number: check(client.get('/tasks')), apply_filters(sort, filters)))
+
+    # Second page of the tasks page
+    next_page = {}
+    def load_first_page(number):
+        apply_filters('deadline-ascending', {})(number)
+        next_page['url'] = '/tasks?after=' + re.search(r'after=([^"&]+)', client.get('/tasks').get_data(as_text=True)).group(1)
+    cases.append(Case('tasks next page', lambda number: check(client.get(next_page['url'])), load_first_page))
+
+    # Tasks page with a search, ranked by relevance
+    def search(number):
+        apply_filters('earliest', {})(number)
+        client.post('/search_tasks', data={'search': 'report'})
+    cases.append(Case('tasks search', lambda number: check(client.get('/tasks')), search))
+
+    # Repeat views of unchanged pages, the browser sends the ETag of its copy and gets a 304
+    etags = {}
+    def load_page(url):
+        def setup(number):
+            apply_filters('deadline-ascending', {})(number)
+            etags[url] = check(client.get(url)).headers['ETag']
+        return setup
+    for url in ['/home', '/tasks']:
+        run = lambda number, url=url: check(client.get(url, headers={'If-None-Match': etags[url]}))
+        cases.append(Case(f'{url[1:]} not modified', run, load_page(url)))
+
+    cases.append(Case('filter_sort_task', lambda number: check(client.post('/filter_sort_task', data={
+        'action': 'apply', 'sort': 'priority-descending', **TASK_FILTERS['priority and status']
+    }))))
+
+    # Moves the user's deadlines back and forth between two timezones
+    timezones = ['America/Los_Angeles', 'Europe/Berlin']
+    cases.append(Case('change_timezone', lambda number: check(client.post('/change_timezone', data={'timezone': timezones[number % 2]}))))
+
+    # Each run clears the data of another user
+    delete_clients = {}
+    def log_in_delete_user(number):
+        delete_clients[number] = logged_in_client(user_ids[-1 - number])
+    cases.append(Case('delete_data', lambda number: check(delete_clients[number].post('/delete_data')), log_in_delete_user))
+
+    # Each kind of reminder, sent at the hour with the most reminders of that kind; emails are not really sent
+    for kind in ['today', 'tomorrow', 'hour']:
+        now = {}
+        def prepare(number, kind=kind, now=now):
+            reset_reminders()
+            now['value'] = busiest_send_time(kind)
+        def run(number, kind=kind, now=now):
+            with contextlib.redirect_stdout(io.StringIO()):
+                send_reminders([kind], now=now['value'], prepare_database=False)
+        cases.append(Case(f'reminders {kind}', run, prepare))
+
+    return cases
+
+# Helper function: returns the differences with the baseline that count as regressions, times only count with check_times
+def regressions(results, baseline, tolerance, check_times=False):
+    found = []
+    for name, result in results['cases'].items():
+        expected = baseline['cases'].get(name)
+        if expected is None:
+            continue
+        if result['queries'] > expected['queries']:
+            found.append(f"{name}: {result['queries']} queries, baseline {expected['queries']}")
+        if check_times and result['seconds'] > expected['seconds'] * (1 + tolerance):
+            found.append(f"{name}: {result['seconds'] * 1000:.1f}ms, baseline {expected['seconds'] * 1000:.1f}ms")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description='Query counts and times of the busiest pages and scripts, compared with a baseline')
+    parser.add_argument('--users', type=int, default=20, help='generated users')
+    parser.add_argument('--tasks', type=int, default=1000, help='tasks of each generated user')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the data generator')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each case')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='JSON file of the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='share a case may be slower than the baseline with --check-times, 0.5 is 50%%')
+    parser.add_argument('--check-times', action='store_true', help='also fail on slower times, only meaningful with a baseline recorded on this machine')
+    parser.add_argument('--save', action='store_true', help='save the results as the new baseline instead of comparing')
+    args = parser.parse_args()
+    if args.repeat >= args.users:
+        sys.exit("--users must be greater than --repeat, delete_data clears another user on every run")
+
+    # Emails of the reminder cases are built but not sent
+    mail.state.suppress = True
+    try:
+        with app.app_context():
+            user_ids = seed_database(args.users, args.tasks, args.seed)
+
+        results = {'settings': {'users': args.users, 'tasks': args.tasks, 'seed': args.seed}, 'cases': {}}
+        print(f"{args.users} users, {args.tasks} tasks each, {args.repeat} runs per case")
+        print(f"{'case':<46}{'queries':>8}{'ms':>10}")
+        for case in build_cases(user_ids, args.repeat):
+            result = measure(case, args.repeat)
+            results['cases'][case.name] = result
+            print(f"{case.name:<46}{result['queries']:>8}{result['seconds'] * 1000:>10.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+            file.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f"No baseline at {args.baseline}, run with --save to create it")
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline['settings'] != results['settings']:
+        sys.exit(f"The baseline was recorded with {baseline['settings']}, run with the same --users, --tasks and --seed")
+
+    found = regressions(results, baseline, args.tolerance, args.check_times)
+    for regression in found:
+        print(f"REGRESSION {regression}")
+    if found:
+        # Exit with an error code so scripts can detect regressions
+        raise SystemExit(1)
+    print("No regressions")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# Fills a database with generated users and tasks for the benchmarks
+# Timezones, priorities, statuses and deadlines follow rough real-world proportions: most tasks are in the past and complete,
+# upcoming tasks are mostly in progress and due within the next few weeks. The same seed always creates the same data
+# (relative to today's date), so benchmark runs on different days stay comparable
+#
+# Usage: DATABASE_URL=sqlite:////tmp/benchmark.db python benchmarks/seed.py [--users 20] [--tasks 1000] [--seed 0]
+# DATABASE_URL is required so the app's own database is never filled by mistake
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# Makes app.py importable when running from the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+from sqlalchemy import select, func
+from werkzeug.security import generate_password_hash
+from app import app, db, User, Task, init_database, rebuild_task_stats, rebuild_scheduled_reminders
+
+# Password of every generated user
+PASSWORD = 'benchmark'
+
+# (value, weight) pairs each generated value is picked from
+TIMEZONES = [
+    ('America/New_York', 30), ('America/Chicago', 10), ('America/Los_Angeles', 20), ('Europe/London', 10),
+    ('Europe/Berlin', 10), ('Asia/Kolkata', 8), ('Asia/Tokyo', 7), ('Australia/Sydney', 5),
+]
+PRIORITIES = [('High', 25), ('Medium', 45), ('Low', 30)]
+
+# Share of tasks due in the past, and the share of those that were completed; upcoming tasks are rarely complete
+PAST_SHARE = 0.7
+PAST_COMPLETE_SHARE = 0.85
+UPCOMING_COMPLETE_SHARE = 0.1
+
+# Past deadlines are spread over the last PAST_DAYS days, upcoming ones are UPCOMING_MEAN_DAYS away on average
+PAST_DAYS = 2 * 365
+UPCOMING_MEAN_DAYS = 14
+
+TITLE_WORDS = ['Buy', 'Call', 'Email', 'Finish', 'Review', 'Plan', 'Pay', 'Book', 'Clean', 'Write', 'Prepare', 'Fix']
+TITLE_OBJECTS = ['groceries', 'report', 'dentist', 'rent', 'slides', 'car', 'taxes', 'flights', 'kitchen', 'invoice', 'essay', 'meeting']
+DESCRIPTION_WORDS = ['before', 'the', 'weekend', 'with', 'notes', 'from', 'last', 'week', 'and', 'send', 'update', 'to', 'team', 'family', 'client']
+
+# Helper function: picks one value of a list of (value, weight) pairs
+def weighted_choice(generator, choices):
+    values, weights = zip(*choices)
+    return generator.choices(values, weights)[0]
+
+# Helper function: returns the deadline of a generated task as the wall-clock time of the user's timezone
+def random_deadline(generator, today):
+    if generator.random() < PAST_SHARE:
+        day = today - timedelta(days=generator.randrange(1, PAST_DAYS))
+    else:
+        day = today + timedelta(days=int(generator.expovariate(1 / UPCOMING_MEAN_DAYS)))
+    # Tasks are due during the day, on the quarter hour
+    return datetime(day.year, day.month, day.day, generator.randrange(8, 23), generator.choice([0, 15, 30, 45]))
+
+# Helper function: returns the column values of one generated task
+def random_task(generator, user_id, today):
+    deadline = random_deadline(generator, today)
+    complete_share = PAST_COMPLETE_SHARE if deadline.date() < today else UPCOMING_COMPLETE_SHARE
+    return {
+        'title': f"{generator.choice(TITLE_WORDS)} {generator.choice(TITLE_OBJECTS)}",
+        'description': ' '.join(generator.choices(DESCRIPTION_WORDS, k=generator.randrange(3, 12))),
+        'priority': weighted_choice(generator, PRIORITIES),
+        'deadline': deadline,
+        'status': 'Complete' if generator.random() < complete_share else 'In-Progress',
+        'set_today_reminder': True,
+        'set_tomorrow_reminder': True,
+        'user_id': user_id,
+    }
+
+# Creates the app's tables and adds users users with tasks tasks each, returns the ids of the new users
+# Users are called bench1@example.com, bench2@example.com... and all use PASSWORD; must be called within an application context
+def seed_database(users, tasks, seed=0):
+    generator = random.Random(seed)
+    init_database()
+
+    # Hashing is slow on purpose, so every user gets the same hash
+    password_hash = generate_password_hash(PASSWORD)
+    first_id = (db.session.execute(select(func.max(User.id))).scalar() or 0) + 1
+    user_rows = [{
+        'id': user_id,
+        'email': f'bench{user_id}@example.com',
+        'username': f'bench{user_id}',
+        'first': 'Bench',
+        'last': 'Mark',
+        'password_hash': password_hash,
+        'timezone': weighted_choice(generator, TIMEZONES),
+        'email_notifications': True,
+        'reminder_digest': generator.random() < 0.3,
+    } for user_id in range(first_id, first_id + users)]
+    db.session.execute(User.__table__.insert(), user_rows)
+
+    # Tasks are inserted with one executemany INSERT per user, the search index is filled by its triggers
+    for user in user_rows:
+        today = datetime.now(ZoneInfo(user['timezone'])).date()
+        db.session.execute(Task.__table__.insert(), [random_task(generator, user['id'], today) for _ in range(tasks)])
+
+    rebuild_task_stats()
+    rebuild_scheduled_reminders()
+    db.session.commit()
+    return [user['id'] for user in user_rows]
+
+def main():
+    parser = argparse.ArgumentParser(description='Fills the database of DATABASE_URL with generated users and tasks')
+    parser.add_argument('--users', type=int, default=20, help='users to create')
+    parser.add_argument('--tasks', type=int, default=1000, help='tasks of each user')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random generator')
+    args = parser.parse_args()
+
+    if 'DATABASE_URL' not in os.environ:
+        sys.exit("Set DATABASE_URL to the database to fill, e.g. DATABASE_URL=sqlite:////tmp/benchmark.db")
+
+    with app.app_context():
+        user_ids = seed_database(args.users, args.tasks, args.seed)
+    print(f"Created {len(user_ids)} users with {args.tasks} tasks each, password '{PASSWORD}'")
+
+if __name__ == '__main__':
+    main()
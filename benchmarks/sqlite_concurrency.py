@@ -0,0 +1,132 @@
+# Measures read throughput of the tasks page query while other processes keep writing tasks,
+# with SQLite's default settings and with the SQLITE_PRAGMAS of app.py
+#
+# Usage: python benchmarks/sqlite_concurrency.py [--readers 4] [--writers 2] [--seconds 5] [--tasks 5000]
+# Each profile runs on its own temporary database, the app's database is not used
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Process, Queue
+
+# Makes app.py importable when running from the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+from sqlalchemy import create_engine
+from app import app, db, SQLITE_PRAGMAS, apply_sqlite_pragmas
+
+# Settings of each profile; 'default' only sets the journal mode since WAL is saved within the database file
+PROFILES = {
+    'default': {'journal_mode': 'DELETE'},
+    'tuned': SQLITE_PRAGMAS,
+}
+
+# First page of the tasks page sorted by deadline, and the count of the user's tasks
+READ_QUERIES = [
+    'SELECT id, title, description, priority, deadline, status FROM task WHERE user_id = ? ORDER BY deadline, id LIMIT 51',
+    'SELECT count(id) FROM task WHERE user_id = ? AND status = 2',
+]
+WRITE_QUERY = 'INSERT INTO task (title, description, priority, deadline, status, set_today_reminder, set_tomorrow_reminder, user_id) VALUES (?, ?, ?, ?, ?, 1, 1, ?)'
+
+# Python's sqlite3 waits up to 5 seconds for a lock by default, both profiles keep that
+CONNECT_TIMEOUT = 5
+
+def connect(path, profile):
+    connection = sqlite3.connect(path, timeout=CONNECT_TIMEOUT)
+    apply_sqlite_pragmas(connection, PROFILES[profile])
+    return connection
+
+def random_task(user_id):
+    deadline = datetime(2025, 1, 1) + timedelta(minutes=random.randrange(2 * 365 * 24 * 60))
+    return ('Task', 'Benchmark task', random.randint(1, 3), deadline.isoformat(' '), random.randint(1, 2), user_id)
+
+# Creates the app's tables within a new database file and adds the tasks of one user
+def create_database(path, profile, task_count):
+    # The app's connect event would apply the tuned settings to every profile
+    app.config['SQLITE_TUNING'] = False
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+    connection = connect(path, profile)
+    connection.execute("INSERT INTO user (id, email, username, first, last, password_hash, timezone, email_notifications) VALUES (1, 'bench@example.com', 'bench', 'Bench', 'Mark', '', 'UTC', 1)")
+    connection.executemany(WRITE_QUERY, [random_task(1) for _ in range(task_count)])
+    connection.commit()
+    connection.execute('ANALYZE')
+    connection.close()
+
+def reader(path, profile, stop_at, results):
+    connection = connect(path, profile)
+    reads = errors = 0
+    while time.monotonic() < stop_at:
+        try:
+            for query in READ_QUERIES:
+                connection.execute(query, (1,)).fetchall()
+            reads += 1
+        except sqlite3.OperationalError:  # 'database is locked'
+            errors += 1
+    connection.close()
+    results.put(('read', reads, errors))
+
+def writer(path, profile, stop_at, results):
+    connection = connect(path, profile)
+    writes = errors = 0
+    while time.monotonic() < stop_at:
+        try:
+            connection.execute(WRITE_QUERY, random_task(1))
+            connection.commit()  # one transaction per task, like add_task()
+            writes += 1
+        except sqlite3.OperationalError:
+            connection.rollback()
+            errors += 1
+    connection.close()
+    results.put(('write', writes, errors))
+
+def run_profile(profile, readers, writers, seconds, task_count):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.db')
+        create_database(path, profile, task_count)
+
+        results = Queue()
+        stop_at = time.monotonic() + seconds
+        processes = [Process(target=reader, args=(path, profile, stop_at, results)) for _ in range(readers)]
+        processes += [Process(target=writer, args=(path, profile, stop_at, results)) for _ in range(writers)]
+        for process in processes:
+            process.start()
+        totals = {'read': [0, 0], 'write': [0, 0]}
+        for _ in processes:
+            kind, count, errors = results.get()
+            totals[kind][0] += count
+            totals[kind][1] += errors
+        for process in processes:
+            process.join()
+
+    return {
+        'reads_per_second': totals['read'][0] / seconds,
+        'writes_per_second': totals['write'][0] / seconds,
+        'read_errors': totals['read'][1],
+        'write_errors': totals['write'][1],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Read and write throughput of SQLite with default and tuned settings')
+    parser.add_argument('--readers', type=int, default=4, help='processes running the tasks page queries')
+    parser.add_argument('--writers', type=int, default=2, help='processes adding tasks')
+    parser.add_argument('--seconds', type=float, default=5, help='duration of each profile')
+    parser.add_argument('--tasks', type=int, default=5000, help='tasks within the database before the run')
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile, {args.tasks} tasks")
+    print(f"{'profile':<10}{'reads/s':>12}{'writes/s':>12}{'read errors':>14}{'write errors':>14}")
+    for profile in PROFILES:
+        result = run_profile(profile, args.readers, args.writers, args.seconds, args.tasks)
+        print(f"{profile:<10}{result['reads_per_second']:>12.0f}{result['writes_per_second']:>12.0f}{result['read_errors']:>14}{result['write_errors']:>14}")
+
+if __name__ == '__main__':
+    main()
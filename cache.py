@@ -0,0 +1,99 @@
+import pickle
+import threading
+from collections import OrderedDict
+
+# Keeps cached values within the memory of the process, evicting the least recently used values once the cached values
+# take more than max_bytes; each process (e.g. each gunicorn worker) has its own cache
+class MemoryBackend:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()    # {key: (value, size)}, the least recently used first
+        self.used_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        # The size is estimated from the pickled value, the same bytes a shared backend would store
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.used_bytes -= old[1]
+            self.entries[key] = (value, size)
+            self.used_bytes += size
+            while self.used_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.used_bytes -= evicted_size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.used_bytes = 0
+
+# Keeps cached values within Redis so every gunicorn worker (and every server) shares them
+# Needs the redis package ('pip install redis'); Redis evicts values by itself once it reaches its maxmemory setting
+# when it is configured with 'maxmemory-policy allkeys-lru', and every value also expires after ttl seconds
+class RedisBackend:
+    def __init__(self, url, ttl=24 * 60 * 60, prefix='taskmanager:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("A redis:// CACHE_URL needs the redis package, install it with 'pip install redis'")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    # Turns a key tuple into a Redis key, e.g. ('calendar', 1, 2025, 9) -> 'taskmanager:calendar:1:2025:9'
+    def redis_key(self, key):
+        return self.prefix + ':'.join(map(str, key))
+
+    def get(self, key):
+        data = self.client.get(self.redis_key(key))
+        return None if data is None else pickle.loads(data)
+
+    def set(self, key, value):
+        self.client.set(self.redis_key(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ex=self.ttl)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+# Cache of computed values, e.g. rendered page fragments, stored within a backend
+# Keys are tuples that include everything the value depends on, such as the user's data version, so values never have
+# to be removed when data changes: a change leads to a new key, and the old value is evicted once it's no longer used
+#
+# Example:
+#   cache = FragmentCache(MemoryBackend())
+#   html = cache.get_or_set(('calendar', user_id, year, month, version), lambda: render_template(...))
+class FragmentCache:
+    def __init__(self, backend):
+        self.backend = backend
+
+    # Returns the cached value of the key, or computes it with create() and caches it; None values are not cached
+    def get_or_set(self, key, create):
+        value = self.backend.get(key)
+        if value is None:
+            value = create()
+            if value is not None:
+                self.backend.set(key, value)
+        return value
+
+    def clear(self):
+        self.backend.clear()
+
+# Helper function: returns the backend of a CACHE_URL setting, an empty url keeps the cache within each process
+def cache_backend(url, max_bytes):
+    if url and url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    if url:
+        raise ValueError(f"Unsupported CACHE_URL {url!r}, use a redis:// url or leave it empty")
+    return MemoryBackend(max_bytes)
@@ -0,0 +1,9 @@
+# Gunicorn settings, loaded automatically by 'gunicorn app:app' (see Procfile)
+
+# Runs within each worker process once the app is loaded
+# Every worker starts its outbox thread, which sends emails left queued by workers that stopped, and its own reminder
+# scheduler when REMINDER_SCHEDULER is on; the job lease in app.py makes sure only one of them sends the reminders of each run
+def post_worker_init(worker):
+    from app import start_outbox_worker, start_reminder_scheduler
+    start_outbox_worker()
+    start_reminder_scheduler()
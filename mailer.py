@@ -0,0 +1,133 @@
+import smtplib
+import threading
+import time
+
+from flask_mail import BadHeaderError
+
+# Errors that will fail again no matter how many times the message is resent, so they are raised right away
+PERMANENT_ERRORS = (
+    smtplib.SMTPAuthenticationError,
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPNotSupportedError,
+    BadHeaderError,
+)
+
+# Keeps one authenticated SMTP connection open and reuses it for every email, instead of Flask-Mail's
+# mail.send() which opens a new connection (TCP + TLS handshake + login) for each message
+# Must be used within an application context, like mail.send()
+#
+# Example:
+#   with MailTransport(mail) as transport:
+#       failed = transport.send_batch(messages)
+class MailTransport:
+    def __init__(self, mail, retries=3, backoff=1.0, idle_timeout=30):
+        self.mail = mail
+        self.retries = retries              # number of times a message is resent after a connection error
+        self.backoff = backoff              # seconds to wait before the first retry, doubled for every next retry
+        self.idle_timeout = idle_timeout    # seconds without sending after which the connection is checked before use
+        self.connection = None
+        self.last_used = 0
+        # Only one thread can use the connection at a time
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Opens the connection if it isn't open yet and returns it
+    def open(self):
+        if self.connection is None:
+            connection = self.mail.connect()
+            connection.__enter__() # connects, starts TLS and logs in
+            self.connection = connection
+            self.last_used = time.monotonic()
+        return self.connection
+
+    # Closes the connection, ignoring errors of connections that were already dropped by the server
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.__exit__(None, None, None)
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.connection = None
+
+    # Checks whether an open connection can still be used, servers drop connections that are idle for too long
+    def is_alive(self):
+        host = self.connection.host
+        # host is None when sending is suppressed (MAIL_SUPPRESS_SEND or TESTING)
+        if host is None or time.monotonic() - self.last_used < self.idle_timeout:
+            return True
+        try:
+            return host.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    # Sends one message over the shared connection, reconnects and retries with exponential backoff on connection errors
+    def send(self, message):
+        with self.lock:
+            for attempt in range(self.retries + 1):
+                try:
+                    if self.connection is not None and not self.is_alive():
+                        self.close()
+                    self.open().send(message)
+                    self.last_used = time.monotonic()
+                    return
+                except PERMANENT_ERRORS:
+                    raise
+                except (smtplib.SMTPException, OSError):
+                    # Drops the broken connection so the next attempt opens a new one
+                    self.close()
+                    if attempt == self.retries:
+                        raise
+                    time.sleep(self.backoff * 2 ** attempt)
+
+    # Sends every message over the shared connection and returns a list of (message, error) for the ones that failed
+    # A failed message doesn't stop the rest of the batch
+    def send_batch(self, messages):
+        failed = []
+        for message in messages:
+            try:
+                self.send(message)
+            except (smtplib.SMTPException, OSError, BadHeaderError) as error:
+                failed.append((message, error))
+        return failed
+
+# Background thread that sends queued emails outside of the HTTP request, so a slow SMTP server doesn't hold up the page
+# drain is a function that sends the emails that are ready and is called within an application context
+# Each process (e.g. each gunicorn worker) starts its own thread the first time wake() is called
+class OutboxWorker:
+    def __init__(self, app, drain, poll_interval=60):
+        self.app = app
+        self.drain = drain
+        self.poll_interval = poll_interval  # seconds between checks for emails waiting to be retried
+        self.event = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    # Starts the thread if it isn't running yet
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='outbox-worker', daemon=True)
+                self.thread.start()
+
+    # Tells the thread that new emails were queued, starting it if needed
+    def wake(self):
+        self.start()
+        self.event.set()
+
+    def run(self):
+        while True:
+            # Waits until wake() is called or poll_interval passes
+            self.event.wait(self.poll_interval)
+            self.event.clear()
+            try:
+                with self.app.app_context():
+                    self.drain()
+            except Exception:
+                # Keeps the thread alive, the emails stay queued and are retried on the next check
+                self.app.logger.exception("Outbox worker failed to send queued emails")
@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from flask import Response, request, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds in seconds of the buckets of the request duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Measurements of one request or background job, collected while it runs
+@dataclass
+class Tracker:
+    name: str                   # endpoint of the request, or name of the job
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    sql_seconds: float = 0.0
+    render_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)   # number of times each SQL statement ran, by its text
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+# Totals of every request of one endpoint (or every run of one job) since the process started
+@dataclass
+class Totals:
+    count: int = 0
+    queries: int = 0
+    sql_seconds: float = 0.0
+    render_seconds: float = 0.0
+    response_bytes: int = 0
+    seconds: float = 0.0
+    n_plus_one: int = 0
+    buckets: list = field(default_factory=lambda: [0] * len(DURATION_BUCKETS))
+
+# Measures the SQL statements, template rendering time and response size of every request, and publishes them
+# as Prometheus text on /metrics and as a Server-Timing header on each response
+# Each process (e.g. each gunicorn worker) keeps its own totals, which carry a 'pid' label
+#
+# n_plus_one: when set, logs a warning if a request or job runs the same SQL statement more than this many times,
+# which usually means rows are loaded one at a time within a loop instead of with one query
+#
+# Example:
+#   request_metrics = RequestMetrics(app, n_plus_one=10)
+#   with request_metrics.track('send_reminders'):   # measures code running outside of a request
+#       ...
+class RequestMetrics:
+    def __init__(self, app=None, n_plus_one=0, server_timing=True):
+        self.n_plus_one = n_plus_one
+        self.server_timing = server_timing
+        self.totals = {}
+        self.lock = threading.Lock()
+        # The tracker of the request or job running on each thread
+        self.local = threading.local()
+        self.logger = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.logger = app.logger
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+        app.teardown_request(self.stop_tracking)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        before_render_template.connect(self.start_render, app)
+        template_rendered.connect(self.finish_render, app)
+        # Listens to every engine, statements are only counted while a tracker runs on the thread
+        event.listen(Engine, 'before_cursor_execute', self.start_statement)
+        event.listen(Engine, 'after_cursor_execute', self.finish_statement)
+
+    # Returns the tracker of the current thread, or None outside of a tracked request or job
+    @property
+    def tracker(self):
+        return getattr(self.local, 'tracker', None)
+
+    def start_request(self):
+        self.local.tracker = Tracker(request.endpoint or 'none')
+
+    def finish_request(self, response):
+        tracker = self.tracker
+        if tracker is None:
+            return response
+        seconds = tracker.elapsed()
+        self.record(tracker, seconds, response.content_length or 0)
+        if self.server_timing:
+            # Durations are in milliseconds, e.g. 'sql;dur=3.2;desc="5 queries", render;dur=1.1, total;dur=7.9'
+            response.headers['Server-Timing'] = ', '.join([
+                f'sql;dur={tracker.sql_seconds * 1000:.1f};desc="{tracker.queries} queries"',
+                f'render;dur={tracker.render_seconds * 1000:.1f}',
+                f'total;dur={seconds * 1000:.1f}',
+            ])
+        return response
+
+    def stop_tracking(self, error=None):
+        self.local.tracker = None
+
+    # Measures code running outside of a request, e.g. a reminder run; nested calls within a request are measured by the request
+    @contextmanager
+    def track(self, name):
+        if self.tracker is not None:
+            yield self.tracker
+            return
+        tracker = self.local.tracker = Tracker(name)
+        try:
+            yield tracker
+        finally:
+            self.local.tracker = None
+            self.record(tracker, tracker.elapsed(), 0)
+
+    def start_statement(self, connection, cursor, statement, parameters, context, executemany):
+        if self.tracker is not None:
+            connection.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    def finish_statement(self, connection, cursor, statement, parameters, context, executemany):
+        tracker = self.tracker
+        started = connection.info.get('metrics_started')
+        if tracker is None or not started:
+            return
+        tracker.queries += 1
+        tracker.sql_seconds += time.perf_counter() - started.pop()
+        # Only SELECT statements are checked for N+1 queries, schema reads like PRAGMA table_info repeat on purpose
+        if self.n_plus_one and statement.lstrip()[:6].upper() == 'SELECT':
+            tracker.statements[statement] += 1
+
+    def start_render(self, sender, template, context, **extra):
+        if self.tracker is not None:
+            self.local.render_started = time.perf_counter()
+
+    def finish_render(self, sender, template, context, **extra):
+        started = getattr(self.local, 'render_started', None)
+        if self.tracker is not None and started is not None:
+            self.tracker.render_seconds += time.perf_counter() - started
+            self.local.render_started = None
+
+    # Adds a finished request or job to the totals of its name
+    def record(self, tracker, seconds, response_bytes):
+        repeated = False
+        if self.n_plus_one and tracker.statements:
+            statement, count = tracker.statements.most_common(1)[0]
+            if count > self.n_plus_one:
+                repeated = True
+                self.logger.warning("Possible N+1 queries: %s ran the same statement %d times: %s", tracker.name, count, ' '.join(statement.split()))
+
+        with self.lock:
+            totals = self.totals.setdefault(tracker.name, Totals())
+            totals.count += 1
+            totals.queries += tracker.queries
+            totals.sql_seconds += tracker.sql_seconds
+            totals.render_seconds += tracker.render_seconds
+            totals.response_bytes += response_bytes
+            totals.seconds += seconds
+            if repeated:
+                totals.n_plus_one += 1
+            for position, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    totals.buckets[position] += 1
+
+    # Returns the totals in the Prometheus text format
+    def render(self):
+        pid = os.getpid()
+        with self.lock:
+            totals = {name: Totals(**vars(values)) for name, values in sorted(self.totals.items())}
+            for values in totals.values():
+                values.buckets = list(values.buckets)
+
+        def labels(name, **extra):
+            pairs = {'endpoint': name, 'pid': pid, **extra}
+            return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in pairs.items()) + '}'
+
+        lines = []
+        counters = [
+            ('taskmanager_requests_total', 'Requests handled, or runs of a background job', 'count'),
+            ('taskmanager_sql_queries_total', 'SQL statements run', 'queries'),
+            ('taskmanager_sql_seconds_total', 'Seconds spent running SQL statements', 'sql_seconds'),
+            ('taskmanager_render_seconds_total', 'Seconds spent rendering templates', 'render_seconds'),
+            ('taskmanager_response_bytes_total', 'Bytes of the response bodies', 'response_bytes'),
+            ('taskmanager_n_plus_one_total', 'Requests that ran the same SQL statement more than the N+1 threshold', 'n_plus_one'),
+        ]
+        for metric, description, attribute in counters:
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} counter')
+            for name, values in totals.items():
+                lines.append(f'{metric}{labels(name)} {getattr(values, attribute)}')
+
+        metric = 'taskmanager_request_duration_seconds'
+        lines.append(f'# HELP {metric} Duration of requests and background jobs')
+        lines.append(f'# TYPE {metric} histogram')
+        for name, values in totals.items():
+            for bound, count in zip(DURATION_BUCKETS, values.buckets):
+                lines.append(f'{metric}_bucket{labels(name, le=bound)} {count}')
+            lines.append(f'{metric}_bucket{labels(name, le="+Inf")} {values.count}')
+            lines.append(f'{metric}_sum{labels(name)} {values.seconds}')
+            lines.append(f'{metric}_count{labels(name)} {values.count}')
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+# Helper function: escapes a Prometheus label value
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
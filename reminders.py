@@ -0,0 +1,231 @@
+from flask_mail import Message                                  # Import Email Support
+from dataclasses import dataclass
+from datetime import timedelta                                  # Import date/time utilities
+from app import db, app, mail, request_metrics, Task, User, ScheduledReminder, SentReminder, REMINDER_KINDS, utc_now, init_database, drain_outbox   # Import app components, database models and helpers
+from mailer import MailTransport                                # Import the shared SMTP connection
+from sqlalchemy import select, exists, literal, or_, tuple_
+from sqlalchemy.exc import IntegrityError
+from itertools import groupby
+
+import sys
+import uuid
+
+# Number of rows loaded from the database at a time while sending reminders
+REMINDER_CHUNK_SIZE = 500
+
+# Seconds a reminder run keeps its claimed reminders; if the run crashed before sending them, the next run sends them
+REMINDER_CLAIM_SECONDS = 15 * 60
+
+# Days the ledger remembers sent reminders after their deadline
+SENT_REMINDER_DAYS = 7
+
+# Task column switched off once the reminder of each kind was sent, 'hour' reminders have no column
+REMINDER_FLAGS = {
+    'today': Task.set_today_reminder,
+    'tomorrow': Task.set_tomorrow_reminder,
+}
+
+# Describes how the email of one kind of reminder looks
+@dataclass
+class ReminderMode:
+    subject: str        # email subject, {title} is replaced by the task's title
+    body: str           # email body, {title}, {due} and {description} are replaced by the task's values
+    due_format: str     # strftime format of the deadline within the body
+    digest_when: str    # describes when the tasks are due within the digest email, e.g. 'Due Today'
+
+# Email of each kind of reminder; when each kind is sent is defined by REMINDER_KINDS in app.py
+REMINDER_MODES = {
+    # Tasks due today in the user's timezone
+    'today': ReminderMode(
+        subject="⏰ Task Reminder: {title} Due Today",
+        body="Your task '{title}' is due today at {due}.\n\nDescription: {description}",
+        due_format='%I:%M %p',
+        digest_when='Due Today',
+    ),
+    # Tasks due tomorrow in the user's timezone
+    'tomorrow': ReminderMode(
+        subject="⏰ Task Reminder: {title} Due Tomorrow",
+        body="Your task '{title}' is due tomorrow {due}.\n\nDescription: {description}",
+        due_format='%B %d %Y @ %I:%M %p',
+        digest_when='Due Tomorrow',
+    ),
+    # Tasks due within the next 60 minutes
+    'hour': ReminderMode(
+        subject="⏰ Task Reminder: {title} Due in Less than an Hour",
+        body="Your task '{title}' is due today at {due}.\n\nDescription: {description}",
+        due_format='%I:%M %p',
+        digest_when='Due in Less than an Hour',
+    ),
+}
+
+# Helper function: builds one query returning (task id, kind, deadline) of every scheduled reminder that should be sent now
+# Send times were computed in UTC when the task was saved, so this only reads the rows found by the send_at index
+# Reminders already in the ledger for the task's current deadline are skipped by the query itself
+def due_reminders_query(kinds=None, now=None):
+    now = now or utc_now()
+    already_sent = exists().where(
+        SentReminder.task_id == ScheduledReminder.task_id,
+        SentReminder.kind == ScheduledReminder.kind,
+        SentReminder.deadline == Task.deadline
+    )
+    query = select(ScheduledReminder.task_id, ScheduledReminder.kind, Task.deadline).join(Task, ScheduledReminder.task_id == Task.id).join(User, ScheduledReminder.user_id == User.id).where(
+        # Every reminder whose send time passed is due until it is too late, so reminders that failed or whose run crashed
+        # are sent by a later run; the ledger (already_sent) keeps them from being sent twice
+        ScheduledReminder.send_at <= now,
+        ScheduledReminder.expires_at > now, # skips reminders that are too late
+        Task.status == 'In-Progress',
+        User.email_notifications.is_(True), # Checks if user set email notifications to on
+        ~already_sent
+    )
+    # Skips the kinds switched off on the task
+    for kind, flag in REMINDER_FLAGS.items():
+        query = query.where(or_(ScheduledReminder.kind != kind, flag.is_(True)))
+    # If kinds is given only send those kinds of reminders, otherwise send every kind
+    if kinds:
+        query = query.where(ScheduledReminder.kind.in_(kinds))
+    return query
+
+# Helper function: claims every due reminder for this run by adding it to the ledger, returns the number of reminders claimed
+# Finding and claiming the reminders is one INSERT ... SELECT, so a second run started at the same time (e.g. a manual rerun)
+# finds them already claimed and sends nothing
+def claim_due_reminders(run_id, kinds=None, now=None):
+    now = now or utc_now()
+    # Claims of a run that crashed before sending are released so this run sends those reminders
+    db.session.execute(SentReminder.__table__.delete().where(
+        SentReminder.status == 'Sending',
+        SentReminder.claimed_at <= now - timedelta(seconds=REMINDER_CLAIM_SECONDS)
+    ))
+    due = due_reminders_query(kinds, now).add_columns(literal('Sending'), literal(run_id), literal(now))
+    try:
+        claimed = db.session.execute(SentReminder.__table__.insert().from_select(
+            ['task_id', 'kind', 'deadline', 'status', 'run_id', 'claimed_at'], due
+        )).rowcount
+        db.session.commit()
+    except IntegrityError:
+        # Another run claimed some of the same reminders between the SELECT and the INSERT, it sends them
+        db.session.rollback()
+        return 0
+    return claimed
+
+# Helper function: yields (reminder, task, user) rows of the reminders claimed by the run, loading REMINDER_CHUNK_SIZE rows at a time instead of all at once
+def claimed_reminders(run_id, chunk_size=REMINDER_CHUNK_SIZE):
+    query = select(SentReminder, Task, User).join(Task, SentReminder.task_id == Task.id).join(User, Task.user_id == User.id).where(
+        SentReminder.run_id == run_id
+    ).order_by(
+        User.id,  # keeps each user's reminders next to each other so they can be grouped into one digest
+        SentReminder.kind,
+        Task.deadline,
+        Task.priority, # same deadline: high priority first (priorities are saved as 1 for high to 3 for low)
+        Task.id
+    ).execution_options(yield_per=chunk_size)
+    for reminder, task, user in db.session.execute(query):
+        yield reminder, task, user
+
+# Helper function: creates the reminder email of a task
+def reminder_message(mode, task, user):
+    reminder_mode = REMINDER_MODES[mode]
+    return Message(
+        subject=reminder_mode.subject.format(title=task.title),
+        recipients=[user.email],  # Send to user's email
+        body=reminder_mode.body.format(title=task.title, due=task.deadline.strftime(reminder_mode.due_format), description=task.description)
+    )
+
+# Helper function: creates one digest email listing every due task of a user, tasks are already ordered by deadline and priority
+def digest_message(mode, tasks, user):
+    reminder_mode = REMINDER_MODES[mode]
+    lines = [f"You have {len(tasks)} tasks {reminder_mode.digest_when.lower()}:", ""]
+    for task in tasks:
+        lines.append(f"- {task.title} ({task.priority}) due {task.deadline.strftime(reminder_mode.due_format)}")
+        if task.description:
+            lines.append(f"  {task.description}")
+    return Message(
+        subject=f"⏰ Task Reminder: {len(tasks)} Tasks {reminder_mode.digest_when}",
+        recipients=[user.email],  # Send to user's email
+        body="\n".join(lines)
+    )
+
+# Helper function: yields (email, ledger keys of the reminders it covers) for the reminders claimed by the run
+# Users with digest mode on get one email for all their due tasks of each kind, other users get one email per task
+def reminder_messages(run_id):
+    # Rows are ordered by user and kind, so groupby() collects each user's tasks while still streaming the rows
+    for (user, mode), rows in groupby(claimed_reminders(run_id), key=lambda row: (row[2], row[0].kind)):
+        rows = [(reminder, task) for reminder, task, _ in rows]
+        if user.reminder_digest and len(rows) > 1:
+            print(f"Sending {mode} digest to {user.email} for {len(rows)} tasks")
+            yield digest_message(mode, [task for _, task in rows], user), [(reminder.task_id, reminder.kind, reminder.deadline) for reminder, _ in rows]
+        else:
+            for reminder, task in rows:
+                print(f"Sending {mode} reminder to {user.email} for task {task.title} deadline={task.deadline.strftime('%B %d %Y @ %I:%M %p')}")
+                yield reminder_message(mode, task, user), [(reminder.task_id, reminder.kind, reminder.deadline)]
+
+# Helper function: records the result of the run in the ledger within one transaction
+# Claims of failed emails are removed so the next run tries them again, every other claim of the run is marked 'Sent'
+def finish_run(run_id, failed_keys, now=None):
+    now = now or utc_now()
+    sent_ledger = SentReminder.__table__
+    # REMINDER_CHUNK_SIZE keys per statement
+    for start in range(0, len(failed_keys), REMINDER_CHUNK_SIZE):
+        chunk = failed_keys[start:start + REMINDER_CHUNK_SIZE]
+        db.session.execute(sent_ledger.delete().where(
+            SentReminder.run_id == run_id,
+            tuple_(SentReminder.task_id, SentReminder.kind, SentReminder.deadline).in_(chunk)
+        ))
+    db.session.execute(sent_ledger.update().where(SentReminder.run_id == run_id).values(status='Sent', sent_at=now))
+
+    # Switches off the task's reminder flag of each kind that was sent
+    for kind, flag in REMINDER_FLAGS.items():
+        sent_task_ids = select(SentReminder.task_id).where(SentReminder.run_id == run_id, SentReminder.kind == kind)
+        db.session.execute(Task.__table__.update().where(Task.id.in_(sent_task_ids)).values({flag.key: False}))
+
+    # Forgets reminders of old deadlines, and scheduled reminders that are too late to send
+    db.session.execute(sent_ledger.delete().where(
+        SentReminder.status == 'Sent',
+        SentReminder.deadline < now - timedelta(days=SENT_REMINDER_DAYS)
+    ))
+    db.session.execute(ScheduledReminder.__table__.delete().where(ScheduledReminder.expires_at <= now))
+    db.session.commit()
+
+# Sends every scheduled reminder that is due now and wasn't sent yet, returns the number of emails sent
+# kinds limits which reminders are sent, e.g. ['today']; by default every kind is sent
+# prepare_database can be turned off by long-running processes that already called init_database() at startup
+# Running it again, or two runs at the same time, only sends the reminders that weren't sent, e.g. the ones that failed
+def send_reminders(kinds=None, now=None, prepare_database=True):
+    sent = 0
+    failed_keys = []
+    run_id = uuid.uuid4().hex
+    # Create application context to access DB and Flask extensions, the run's SQL statements are counted within /metrics
+    with app.app_context(), request_metrics.track('send_reminders'):
+        # The reminder workflow runs on the repository's database file, which may be older than the current models
+        if prepare_database:
+            init_database()
+
+        if claim_due_reminders(run_id, kinds, now):
+            # All emails of the run are sent over one SMTP connection, which is closed at the end of the run
+            with MailTransport(mail) as transport:
+                for message, keys in reminder_messages(run_id):
+                    # A failed email is reported and skipped so the rest of the reminders are still sent
+                    failed = transport.send_batch([message])
+                    for _, error in failed:
+                        print(f"FAILED to send '{message.subject}' to {message.recipients}: {error}")
+                    if failed:
+                        failed_keys.extend(keys)
+                    else:
+                        sent += 1
+
+        # Saves the results once every row was read
+        finish_run(run_id, failed_keys, now)
+
+    print(f"REMINDERS SENT ({', '.join(kinds or REMINDER_KINDS)}): {sent}")
+    return sent
+
+# Usage: python reminders.py [today|tomorrow|hour ...], sends every kind of reminder if none is given
+if __name__ == "__main__":
+    kinds = sys.argv[1:]
+    unknown = [kind for kind in kinds if kind not in REMINDER_KINDS]
+    if unknown:
+        sys.exit(f"Usage: python reminders.py [{'|'.join(REMINDER_KINDS)} ...]")
+    send_reminders(kinds or None)
+
+    # The hourly run also sends emails left in the outbox, in case no web process is running its outbox thread
+    with app.app_context():
+        print(f"OUTBOX EMAILS SENT: {drain_outbox()}")
@@ -81,3 +81,177 @@ function closePopup(id) {
   show = true;
 }
 
+
+// Calendar of the home page: Prev, Next and the date popup load the chosen month from /api/calendar and swap the days in place
+// instead of reloading the whole page; the months before and after the shown one are loaded ahead of time so flipping is instant
+// The links and the form still work without JavaScript, and are followed if a month can't be loaded
+const calendarSection = document.getElementById('calendar-section');
+// Months loaded from /api/calendar, 'year-month' -> Promise of the response; emptied on every page load, e.g. after a task is saved
+const calendarMonths = new Map();
+const MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December'];
+
+// Returns a date as a 'YYYY-MM-DD' string
+function isoDate(year, month, day) {
+  return `${year}-${String(month).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
+}
+
+// Returns [year, month] moved by offset months, e.g. shiftMonth(2025, 12, 1) -> [2026, 1]
+function shiftMonth(year, month, offset) {
+  const index = year * 12 + (month - 1) + offset;
+  return [Math.floor(index / 12), index % 12 + 1];
+}
+
+// Loads the days of a month from /api/calendar, each month is requested at most once
+function loadMonth(year, month) {
+  const key = `${year}-${month}`;
+  if (!calendarMonths.has(key)) {
+    const [endYear, endMonth] = shiftMonth(year, month, 1);
+    const url = `${calendarSection.dataset.api}?start=${isoDate(year, month, 1)}&end=${isoDate(endYear, endMonth, 1)}`;
+    const request = fetch(url, { credentials: 'same-origin' }).then(response => {
+      if (!response.ok) {
+        throw new Error(`${url} returned ${response.status}`);
+      }
+      return response.json();
+    });
+    // A failed request is forgotten so the month is requested again next time
+    request.catch(() => calendarMonths.delete(key));
+    calendarMonths.set(key, request);
+  }
+  return calendarMonths.get(key);
+}
+
+// Builds the days of a month the same way as calendar_days.html: weeks start on Sunday and days outside the month are empty
+function renderMonth(year, month, data) {
+  const container = document.createElement('div');
+  container.className = 'calendar-days';
+  const firstWeekday = new Date(year, month - 1, 1).getDay(); // 0 = Sunday
+  const daysInMonth = new Date(year, month, 0).getDate();
+  const cells = Math.ceil((firstWeekday + daysInMonth) / 7) * 7;
+
+  for (let cell = 0; cell < cells; cell++) {
+    const day = cell - firstWeekday + 1;
+    const dayElement = document.createElement('div');
+    container.appendChild(dayElement);
+    if (day < 1 || day > daysInMonth) {
+      dayElement.className = 'calendar-day empty';
+      continue;
+    }
+
+    const date = isoDate(year, month, day);
+    dayElement.className = date === data.today ? 'calendar-day today' : 'calendar-day';
+    const dayNumber = document.createElement('p');
+    dayNumber.className = 'day-number';
+    dayNumber.textContent = day;
+    const dayTasks = document.createElement('div');
+    dayTasks.className = 'day-tasks';
+    dayElement.append(dayNumber, dayTasks);
+
+    // Days without tasks are not within data.days
+    const summary = data.days[date];
+    if (!summary) {
+      continue;
+    }
+    for (const task of summary.tasks) {
+      // Same attributes as the task buttons of calendar_days.html, read by openTaskPopup()
+      const button = document.createElement('button');
+      button.type = 'button';
+      button.className = `cal-task ${task.priority.toLowerCase()}`;
+      button.setAttribute('task-id', task.id);
+      button.setAttribute('task-title', task.title);
+      button.setAttribute('task-description', task.description ?? '');
+      button.setAttribute('task-priority', task.priority);
+      button.setAttribute('task-deadline', task.deadline);
+      button.textContent = task.title;
+      button.addEventListener('click', () => openTaskPopup(button, 'task-info-popup'));
+      dayTasks.appendChild(button);
+    }
+    // More button if the day has more tasks than the ones shown, directs to the tasks of that day
+    if (summary.more > 0) {
+      const link = document.createElement('a');
+      link.href = calendarSection.dataset.more.replace('DATE', date);
+      const moreButton = document.createElement('button');
+      moreButton.type = 'button';
+      moreButton.className = 'more-button';
+      moreButton.textContent = ' ... ';
+      link.appendChild(moreButton);
+      dayTasks.appendChild(link);
+    }
+  }
+  return container;
+}
+
+// Shows a month within the calendar, the month name, the Prev and Next links and the month rows of the stats table
+function showMonth(year, month, addToHistory) {
+  return loadMonth(year, month).then(data => {
+    calendarSection.querySelector('.calendar-days').replaceWith(renderMonth(year, month, data));
+    calendarSection.dataset.year = year;
+    calendarSection.dataset.month = month;
+
+    const monthName = MONTH_NAMES[month - 1];
+    document.getElementById('month-year-button').textContent = `${monthName} ${year}`;
+    // The links keep working as fallbacks, so they point to the routes of the shown month
+    for (const id of ['prev-month-link', 'next-month-link']) {
+      const link = document.getElementById(id);
+      link.href = link.getAttribute('href').replace(/\/\d+\/\d+$/, `/${month}/${year}`);
+    }
+
+    // The month stats are the sums of the days of the month
+    let count = 0;
+    let complete = 0;
+    for (const summary of Object.values(data.days)) {
+      count += summary.count;
+      complete += summary.complete;
+    }
+    document.getElementById('tasks-in-month').textContent = count;
+    document.getElementById('completed-tasks-in-month').textContent = complete;
+    document.querySelectorAll('.stats-month-name').forEach(element => element.textContent = monthName);
+
+    // The address shows the month, so reloading or sharing the page opens the same month
+    if (addToHistory) {
+      history.pushState({ year, month }, '', `${calendarSection.dataset.home}?month=${month}&year=${year}`);
+    }
+
+    // Loads the months around the shown one ahead of time, errors are ignored until the month is shown
+    for (const offset of [-1, 1]) {
+      loadMonth(...shiftMonth(year, month, offset)).catch(() => {});
+    }
+  });
+}
+
+// Shows another month without reloading the page, or follows the fallback URL if the month can't be loaded
+function changeMonth(event, year, month, fallback) {
+  event.preventDefault();
+  showMonth(year, month, true).catch(fallback);
+}
+
+if (calendarSection) {
+  const shownMonth = () => [Number(calendarSection.dataset.year), Number(calendarSection.dataset.month)];
+
+  for (const [id, offset] of [['prev-month-link', -1], ['next-month-link', 1]]) {
+    const link = document.getElementById(id);
+    link.addEventListener('click', event => {
+      changeMonth(event, ...shiftMonth(...shownMonth(), offset), () => { window.location.href = link.href; });
+    });
+  }
+
+  // The date popup shows the month of the chosen date, its value is formatted as 'YYYY-MM-DD'
+  const dateForm = document.getElementById('calendar-date-form');
+  dateForm.addEventListener('submit', event => {
+    const [year, month] = dateForm.elements['date'].value.split('-').map(Number);
+    closePopup('calendar-popup');
+    changeMonth(event, year, month, () => dateForm.submit());
+  });
+
+  // The browser's back and forward buttons show the month of that history entry
+  history.replaceState({ year: shownMonth()[0], month: shownMonth()[1] }, '');
+  window.addEventListener('popstate', event => {
+    if (event.state && event.state.year) {
+      showMonth(event.state.year, event.state.month, false).catch(() => window.location.reload());
+    }
+  });
+
+  // Loads the months before and after the shown one ahead of time
+  for (const offset of [-1, 1]) {
+    loadMonth(...shiftMonth(...shownMonth(), offset)).catch(() => {});
+  }
+}